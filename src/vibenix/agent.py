@@ -17,7 +17,7 @@ from vibenix.ccl_log import get_logger
 from vibenix.model_config import DEFAULT_USAGE_LIMITS
 import logging
 import inspect
-from functools import wraps
+from functools import wraps, lru_cache
 from pydantic_ai.messages import ModelMessage
 
 logger = logging.getLogger(__name__)
@@ -441,6 +441,19 @@ def _log_internal_retry_responses(messages, level: str = "warning", log_when_non
         logger.warning("Could not log internal retry response details: %s", e)
 #### END OF DEBUGGING UTILS
 
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """Load the tiktoken encoding used for tool usage estimates once."""
+    import tiktoken
+    return tiktoken.encoding_for_model("gpt-4-1106-preview")
+
+
+@lru_cache(maxsize=256)
+def _count_tokens(text: str) -> int:
+    """Token count of a tool result or call, memoized since tools often return the same text again."""
+    return len(_get_encoder().encode(text))
+
+
 def tool_wrapper(original_func):
     """Decorator to wrap tool functions for usage tracking."""
     @wraps(original_func)
@@ -452,15 +465,13 @@ def tool_wrapper(original_func):
         result = original_func(*args, **kwargs)
 
         # Estimate tokens from result
-        import tiktoken
-        encoder = tiktoken.encoding_for_model("gpt-4-1106-preview")
-        tool_in = len(encoder.encode(str(result)))
+        tool_in = _count_tokens(str(result))
         # Estimate tokens str forming: "function_name(arg1, arg2, karg1=value1, ...)"
         tool_call_str = f"{original_func.__name__}(" + ", ".join(
             [str(a) for a in args] +
             [f"{k}={v}" for k, v in kwargs.items()]
         ) + ")"
-        tool_out = len(encoder.encode(tool_call_str)) # Call is done as output tokens (reasoning)
+        tool_out = _count_tokens(tool_call_str) # Call is done as output tokens (reasoning)
         
         get_model_prompt_manager().add_session_tool_usage(original_func.__name__, prompt=tool_in, completion=tool_out)
         return result
@@ -10,13 +10,16 @@ import textwrap
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TextIO
+from typing import Any, Dict, List, Optional, TextIO, TYPE_CHECKING
 from dataclasses import dataclass, field
 from contextlib import contextmanager
 import functools
 
 from .errors import NixBuildErrorDiff, NixBuildResult
 
+if TYPE_CHECKING:
+    from .model_config import ModelConfig
+
 def enum_str(enum: Enum):
     return f"{type(enum).__name__}.{enum.name}"
 
@@ -140,7 +143,7 @@ class CCLLogger:
         self._file_handle.write(string)
         self._file_handle.flush()
 
-    def log_model_config(self, model_config: dict):
+    def log_model_config(self, model_config: 'ModelConfig'):
         """Log model configuration including pricing if available."""
         self.enter_attribute("model_config")
 
@@ -149,7 +152,7 @@ class CCLLogger:
         self.write_kv("full_model", full_model)
 
         self.enter_attribute("model_settings")
-        model_settings = model_config.get("model_settings", {})
+        model_settings = model_config.model_settings
         for k, v in model_settings.items():
             self.write_kv(k, str(v))
         self.leave_attribute()
@@ -2,14 +2,16 @@
 
 import json
 import os
+from types import MappingProxyType
 
 
 model_settings = os.path.join(os.path.dirname(__file__), "model_settings.json")
-with open(model_settings, "r") as f:
-    DEFAULT_MODEL_SETTINGS = json.load(f)
+with open(model_settings, "rb") as f:
+    # Read-only per provider, so callers can merge over them without copying first
+    DEFAULT_MODEL_SETTINGS = {provider: MappingProxyType(settings) for provider, settings in json.loads(f.read()).items()}
 usage_limits = os.path.join(os.path.dirname(__file__), "usage_limits.json")
-with open(usage_limits, "r") as f:
-    DEFAULT_USAGE_LIMITS = json.load(f)
+with open(usage_limits, "rb") as f:
+    DEFAULT_USAGE_LIMITS = json.loads(f.read())
 
 # Import vibenix settings manager
 from vibenix.defaults.vibenix_settings import (
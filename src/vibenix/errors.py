@@ -1,7 +1,7 @@
 """Error types for the vibenix build system."""
 
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import Optional
 
 class NixBuildErrorDiff(Enum):
@@ -20,6 +20,19 @@ class NixErrorKind(Enum):
 class NixError(BaseModel):
     type: NixErrorKind
     error_message: str
+    _lines: Optional[tuple[str, list[str]]] = PrivateAttr(default=None)
+    
+    def lines(self) -> list[str]:
+        """Return error_message split into lines, split once and reused while the message is unchanged."""
+        if self._lines is None or self._lines[0] is not self.error_message:
+            self._lines = (self.error_message, self.error_message.splitlines())
+        return self._lines[1]
+    
+    def __eq__(self, other: object) -> bool:
+        # pydantic also compares private attributes, but the memoized split is not part of the error
+        if not isinstance(other, NixError):
+            return NotImplemented
+        return self.type == other.type and self.error_message == other.error_message
     
     def truncated(self, max_lines: int = 256, page: int = None, max_line_length: int = 512) -> str:
         """Return truncated version of error message, keeping the tail end and limiting line width.
@@ -32,20 +45,24 @@ class NixError(BaseModel):
         Returns:
             Truncated error message showing the target page with excessively long lines truncated.
         """
-        lines = self.error_message.split('\n')
+        line_count = self.error_message.count('\n') + 1
         # Ensure total_pages is at least 1, even if error_message is empty
-        total_pages = max(1, (len(lines) + max_lines - 1) // max_lines)
+        total_pages = max(1, (line_count + max_lines - 1) // max_lines)
         
-        if page is None:
+        if page is None or page == total_pages:
+            # The last page is the common case, split off only the tail instead of the whole log
             page = total_pages
+            page_lines = self.error_message.rsplit('\n', max_lines)[-max_lines:]
         elif page < 1 or page > total_pages:
             raise ValueError(f"Page number {page} is out of range. Must be between 1 and {total_pages}.")
-            
-        end_index = len(lines) - (total_pages - page) * max_lines - 1
-        start_index = max(0, end_index - (max_lines - 1))
+        else:
+            lines = self.error_message.split('\n')
+            end_index = line_count - (total_pages - page) * max_lines - 1
+            start_index = max(0, end_index - (max_lines - 1))
+            page_lines = lines[start_index:end_index + 1]
         
         truncated_lines = []
-        for line in lines[start_index:end_index + 1]:
+        for line in page_lines:
             if len(line) > max_line_length:
                 # Truncate and add a visual indicator for the LLM/user
                 truncated_lines.append(line[:max_line_length] + "... [LINE TRUNCATED]")
@@ -68,6 +85,7 @@ class NixBuildResult(BaseModel):
     success: bool
     is_src_attr_only: bool
     error: Optional[NixError] = None
+    out_path: Optional[str] = None  # "out" output of a successful build, as reported by nix build --json
 
 
 class FullLogDiff(BaseModel):
@@ -1,5 +1,7 @@
 import shutil
 import os
+import concurrent.futures
+import threading
 import git
 from jinja2 import Template
 from typing import Optional
@@ -11,7 +13,39 @@ from vibenix.nixpkgs_lock import get_nixpkgs_lock_info
 from pathlib import Path
 import subprocess
 
+_repo_cache: dict[str, git.Repo] = {}
+_lock_info_prefetch: Optional[tuple[str, concurrent.futures.Future]] = None  # (nixpkgs commit, pending lock info)
+
+def get_repo() -> git.Repo:
+    """Get the git repository of the flake directory, opened once per path."""
+    path = config.flake_dir.as_posix()
+    repo = _repo_cache.get(path)
+    if repo is None:
+        repo = _repo_cache[path] = git.Repo(path)
+    return repo
+
+def prefetch_nixpkgs_lock_info() -> None:
+    """Start computing the nixpkgs lock info for config.nixpkgs_commit in the background.
+
+    nurl has to download nixpkgs to hash it, which takes seconds; callers start this before
+    their remaining setup (model initialization, prompts) and init_flake picks up the result.
+    """
+    global _lock_info_prefetch
+    commit = config.nixpkgs_commit
+    future = concurrent.futures.Future()
+
+    def fetch():
+        try:
+            future.set_result(get_nixpkgs_lock_info(commit))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # Daemon thread, so an early exit never waits for nurl
+    threading.Thread(target=fetch, daemon=True).start()
+    _lock_info_prefetch = (commit, future)
+
 def init_flake(reference_dir: Optional[Path] = None) -> None:
+    global _lock_info_prefetch
 
     logger.info(f"Creating flake at {config.flake_dir} from reference directory {config.template_dir}")
 
@@ -53,8 +87,12 @@ def init_flake(reference_dir: Optional[Path] = None) -> None:
     with open(template_path, 'r') as f:
         template = Template(f.read())
 
-    # Get nixpkgs lock info for the configured commit
-    lock_info = get_nixpkgs_lock_info(config.nixpkgs_commit)
+    # Get nixpkgs lock info for the configured commit, from the prefetch if one was started for it
+    prefetch, _lock_info_prefetch = _lock_info_prefetch, None
+    if prefetch is not None and prefetch[0] == config.nixpkgs_commit:
+        lock_info = prefetch[1].result()
+    else:
+        lock_info = get_nixpkgs_lock_info(config.nixpkgs_commit)
 
     # Render the template
     flake_lock_content = template.render(**lock_info)
@@ -71,15 +109,18 @@ def init_flake(reference_dir: Optional[Path] = None) -> None:
         ref_path = Path(reference_dir).resolve()
         logger.info(f"Copying contents from reference directory: {ref_path}")
 
-        for item in ref_path.iterdir():
-            dest = config.flake_dir / item.name
-            if item.is_dir(): # TODO improve ts
-                shutil.copytree(item, dest, dirs_exist_ok=True)
-            else:
-                shutil.copy2(item, dest)
-            os.chmod(dest, 0o644 if dest.is_file() else 0o755)
+        with os.scandir(ref_path) as entries:
+            for entry in entries:
+                dest = config.flake_dir / entry.name
+                is_dir = entry.is_dir() # cached from scandir, no extra stat
+                if is_dir: # TODO improve ts
+                    shutil.copytree(entry.path, dest, dirs_exist_ok=True)
+                else:
+                    shutil.copy2(entry.path, dest)
+                os.chmod(dest, 0o755 if is_dir else 0o644)
 
     repo = git.Repo.init(config.flake_dir.as_posix())
+    _repo_cache[config.flake_dir.as_posix()] = repo
     repo.git.add('-A')
     if not reference_dir:
         repo.index.commit("add empty template")
@@ -93,7 +134,7 @@ def update_flake(new_content, commit_msg: str = "") -> str:
     with open(file_path, 'w') as file:
         file.write(new_content)
 
-    repo = git.Repo(config.flake_dir.as_posix())
+    repo = get_repo()
     repo.git.add('-A')
     if commit_msg == "":
         return None
@@ -106,7 +147,7 @@ def get_package_contents() -> str:
         return file.read()
 
 def stage_all_files() -> None:
-    repo = git.Repo(config.flake_dir.as_posix())
+    repo = get_repo()
     repo.git.add('-A')
 
 def get_package_path() -> str:
@@ -121,8 +162,11 @@ def revert_to_commit(commit_hash: str) -> None:
     Args:
         commit_hash: The commit hash to revert to
     """
-    repo = git.Repo(config.flake_dir.as_posix())
-    repo.git.reset('--hard', commit_hash)
+    # Plain git call, GitPython's generic command wrapper adds nothing for a one-off reset
+    subprocess.run(
+        ["git", "-C", config.flake_dir.as_posix(), "reset", "--quiet", "--hard", commit_hash],
+        check=True,
+    )
 
 
 current_system = None
@@ -16,18 +16,17 @@ def get_git_info():
         commit_result = subprocess.run(
             ["git", "rev-parse", "HEAD"],
             capture_output=True,
-            text=True,
             check=True
         )
-        commit_hash = commit_result.stdout.strip()
+        commit_hash = commit_result.stdout.strip().decode('ascii')
         
         # Check if repository is dirty (has uncommitted changes)
         status_result = subprocess.run(
             ["git", "status", "--porcelain", "--untracked-files=no"],
             capture_output=True,
-            text=True,
             check=True
         )
+        # Only emptiness matters, so skip decoding the status output
         is_dirty = bool(status_result.stdout.strip())
         
         return {
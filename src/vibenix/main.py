@@ -32,17 +32,12 @@ def set_ui_mode(ui_mode: bool):
     global _ui_mode
     _ui_mode = ui_mode
 
-import logging
 if "OLLAMA_HOST" in os.environ:
     logger.info(f"OLLAMA_HOST is set to: {os.environ['OLLAMA_HOST']}")
+    logger.info("Note: api_base will be set per-model, not globally")
 else:
     logger.warning("OLLAMA_HOST environment variable is not set")
 
-# TODO: Configure pydantic-ai logging if needed
-if "OLLAMA_HOST" in os.environ:
-    logger.info(f"OLLAMA_HOST available at: {os.environ['OLLAMA_HOST']}")
-    logger.info("Note: api_base will be set per-model, not globally")
-
 def cache_streaming_response(func):
     """Decorator that caches streaming responses.
     
@@ -58,8 +53,8 @@ def cache_streaming_response(func):
             'args': args,
             'kwargs': kwargs
         }
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        cache_key = hashlib.md5(key_str.encode()).hexdigest()
+        key_str = json.dumps(key_data, sort_keys=True, default=str, separators=(',', ':'))
+        cache_key = hashlib.blake2b(key_str.encode(), digest_size=16).hexdigest()
         
         # Check if we have a cached result
         cached_result = cache.get(cache_key)
@@ -90,6 +85,51 @@ def cache_streaming_response(func):
     
     return wrapper
 
+def lookup_csv_package(csv_path: str, package_name: str) -> Optional[tuple[str, str, str, str]]:
+    """Look up a package row in a CSV dataset.
+
+    The first lookup indexes the dataset into the disk cache, one entry per package
+    keyed on the file's path, mtime and size, plus a stamp marker written last; later
+    lookups against the unchanged file read just the requested row instead of scanning.
+
+    Returns:
+        (pname, version, fetcher, nixpkgs_target_bump), or None if the package is not listed
+    """
+    st = os.stat(csv_path)
+    path = os.path.abspath(csv_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    stamp_key = ("csv_stamp", path)
+    row_tag = f"csv_dataset:{path}"
+
+    indexed = cache.get(stamp_key) == stamp
+    if indexed:
+        row = cache.get(("csv_row", path, stamp, package_name))
+        if row is not None:
+            return row
+        # Either not listed or evicted from the shared cache, only the file can tell
+
+    with open(csv_path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        column = {name: i for i, name in enumerate(next(reader))}
+        fields = [column[name] for name in ('pname', 'version', 'fetcher', 'nixpkgs_target_bump')]
+        package_name_i = column['package_name']
+        index = {}
+        for row in reader:
+            # setdefault keeps the first row for a package, like the original early-exit scan
+            index.setdefault(row[package_name_i], tuple(row[i] for i in fields))
+
+    row = index.get(package_name)
+    with cache.transact():
+        if not indexed:
+            cache.evict(row_tag)  # rows of earlier versions of this file
+            for name, entry in index.items():
+                cache.set(("csv_row", path, stamp, name), entry, tag=row_tag)
+            cache.set(stamp_key, stamp)
+        elif row is not None:
+            cache.set(("csv_row", path, stamp, package_name), row, tag=row_tag)
+
+    return row
+
 class Project(BaseModel):
     name: str
     latest_commit_sha1: str
@@ -132,6 +172,10 @@ def run_terminal_ui(maintenance=None, output_dir=None, project_url=None, revisio
     # Set up terminal UI adapter
     set_ui_adapter(TerminalUIAdapter())
 
+    # Let nurl fetch nixpkgs for the flake.lock while the model is configured and initialized
+    from vibenix.flake import prefetch_nixpkgs_lock_info
+    prefetch_nixpkgs_lock_info()
+
     # If project URL, Nix fetcher, or CSV mode are provided, skip interactive configuration
     if (project_url or fetcher or csv_pname or maintenance):
         from vibenix.model_config import load_saved_configuration, initialize_model_config
@@ -163,31 +207,33 @@ def run_terminal_ui(maintenance=None, output_dir=None, project_url=None, revisio
         from vibenix.model_config import initialize_model_config
         initialize_model_config()
 
-    # Run the packaging flow in background thread (like textual UI)
-    import threading
+    try:
+        if maintenance:
+            from vibenix.packaging_flow.maintenance import run_maintenance
+            run_maintenance(maintenance, output_dir=output_dir, revision=revision,
+                           version=target_version, update_lock=update_lock, upgrade_lock=upgrade_lock)
+        else:
+            run_packaging_flow(output_dir=output_dir, project_url=project_url,
+                           revision=revision, fetcher=fetcher,
+                           csv_pname=csv_pname, csv_version=csv_version,
+                           fetcher_content=fetcher_content)
+    except Exception as e:
+        logger.error(f"Error in packaging flow: {e}")
+        import traceback
+        traceback.print_exc()
 
-    def run_coordinator():
-        try:
-            if maintenance:
-                from vibenix.packaging_flow.maintenance import run_maintenance
-                run_maintenance(maintenance, output_dir=output_dir, revision=revision,
-                               version=target_version, update_lock=update_lock, upgrade_lock=upgrade_lock)
-            else:
-                run_packaging_flow(output_dir=output_dir, project_url=project_url,
-                               revision=revision, fetcher=fetcher,
-                               csv_pname=csv_pname, csv_version=csv_version,
-                               fetcher_content=fetcher_content)
-        except Exception as e:
-            logger.error(f"Error in packaging flow: {e}")
-            import traceback
-            traceback.print_exc()
-
-    coordinator_thread = threading.Thread(target=run_coordinator)
-    coordinator_thread.daemon = True
-    coordinator_thread.start()
-
-    # Wait for completion
-    coordinator_thread.join()
+
+def _preload():
+    """Import the heavy third-party libraries (pydantic-ai, the OpenAI SDK) ahead of first use.
+
+    Only leaf packages outside vibenix are imported, so this thread never walks vibenix's own
+    import cycles concurrently with the main thread.
+    """
+    try:
+        import pydantic_ai
+        import pydantic_ai.models.openai
+    except Exception as e:
+        logger.warning(f"Preloading model libraries failed: {e}")
 
 
 def run_textual_ui():
@@ -196,12 +242,8 @@ def run_textual_ui():
     app = VibenixChatApp()
     app.run()
 
-def main():
-    """Main entry point for vibenix."""
-    # Set up signal handlers early, while we're in the main thread
-    from vibenix.ccl_log_safe import setup_safe_logging
-    setup_safe_logging()
-    
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser for vibenix."""
     parser = argparse.ArgumentParser(
         description="Vibenix - AI-powered Nix package builder",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -320,7 +362,20 @@ def main():
         action="version",
         version="vibenix 0.1.0"
     )
-    
+
+    return parser
+
+def main():
+    """Main entry point for vibenix."""
+    # Set up signal handlers early, while we're in the main thread
+    from vibenix.ccl_log_safe import setup_safe_logging
+    setup_safe_logging()
+
+    # Overlap the expensive third-party imports with argument parsing and startup
+    import threading
+    threading.Thread(target=_preload, daemon=True).start()
+
+    parser = _build_parser()
     args = parser.parse_args()
     
     try:
@@ -380,28 +435,19 @@ def main():
                 # Parse CSV dataset and extract package info
                 logger.info(f"Loading package '{args.csv_package}' from CSV dataset: {args.csv_dataset}")
 
-                with open(args.csv_dataset, 'r') as f:
-                    reader = csv.DictReader(f)
-                    package_found = False
-
-                    for row in reader:
-                        if row['package_name'] == args.csv_package:
-                            package_found = True
-                            csv_pname = row['pname']
-                            csv_version = row['version']
-                            fetcher_content = row['fetcher']
+                package_row = lookup_csv_package(args.csv_dataset, args.csv_package)
+                if package_row is None:
+                    logger.error(f"Package '{args.csv_package}' not found in CSV dataset")
+                    sys.exit(1)
 
-                            # Set nixpkgs commit from CSV if not overridden by CLI
-                            if not args.nixpkgs_commit:
-                                config.nixpkgs_commit = row['nixpkgs_target_bump']
+                csv_pname, csv_version, fetcher_content, nixpkgs_target_bump = package_row
 
-                            logger.info(f"Found package: pname={csv_pname}, version={csv_version}")
-                            logger.info(f"Using nixpkgs commit: {config.nixpkgs_commit}")
-                            break
+                # Set nixpkgs commit from CSV if not overridden by CLI
+                if not args.nixpkgs_commit:
+                    config.nixpkgs_commit = nixpkgs_target_bump
 
-                    if not package_found:
-                        logger.error(f"Package '{args.csv_package}' not found in CSV dataset")
-                        sys.exit(1)
+                logger.info(f"Found package: pname={csv_pname}, version={csv_version}")
+                logger.info(f"Using nixpkgs commit: {config.nixpkgs_commit}")
 
             # Set nixpkgs commit if provided via CLI (overrides CSV value)
             if args.nixpkgs_commit:
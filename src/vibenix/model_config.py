@@ -5,35 +5,53 @@ This module provides model configuration compatible with the previous litellm-ba
 
 import os
 import json
+import importlib
 import re
-from typing import Optional, Dict, Any, Tuple
-from pydantic_ai.models import Model
-from pydantic_ai.models.openai import OpenAIChatModel, OpenAIChatModelSettings
-from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.providers.openrouter import OpenRouterProvider
-from pydantic_ai.models.openrouter import OpenRouterModel, OpenRouterModelSettings
-from pydantic_ai.models.anthropic import AnthropicModel, AnthropicModelSettings
-from pydantic_ai.providers.anthropic import AnthropicProvider
-from pydantic_ai.models.google import GoogleModel, GoogleModelSettings
-from pydantic_ai.providers.google import GoogleProvider
-from pydantic_ai.models.bedrock import BedrockConverseModel, BedrockModelSettings
-from pydantic_ai.providers.bedrock import BedrockProvider
+import threading
+from urllib.parse import urlparse
+from functools import lru_cache
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, Mapping, Tuple, TYPE_CHECKING
 from vibenix.ui.logging_config import logger
 
-from botocore.config import Config
-from botocore.exceptions import ClientError
-import boto3
-
 from vibenix.defaults import DEFAULT_MODEL_SETTINGS, DEFAULT_USAGE_LIMITS
+
+if TYPE_CHECKING:
+    from pydantic_ai.models import Model
+    from pydantic_ai.settings import ModelSettings
+
+
+@dataclass(frozen=True, slots=True)
+class ModelConfig:
+    """Resolved model configuration: saved provider and model, settings from env."""
+    provider: str
+    model_name: str
+    base_url: str
+    model_settings: Dict[str, Any]
+
+
 # Cache for model configuration to avoid repeated loading and logging
-_cached_config = None
+_cached_config: Optional[ModelConfig] = None
 _cached_model = None
+_cached_model_name = None  # "provider/model_name", derived from _cached_config
+_model_built_from: Optional[ModelConfig] = None  # Config as loaded when _cached_model was built
 _use_prompted_output = False  # Whether to use PromptedOutput mode for structured outputs
 _BEDROCK_TOOL_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
 _BEDROCK_TOOL_FIELD_PATH_PATTERN = re.compile(
     r"messages\.(\d+)(?:\.member)?\.content\.(\d+)(?:\.member)?\.toolUse\.(name|input)"
 )
 _ENDOFTEXT_MARKER = "<|endoftext|>"
+_DEFAULT_BASE_URL = "http://llama.digidow.ins.jku.at:11434/v1/"
+_DEFAULT_MODEL_NAME = "qwen3-coder-30b-a3b"
+_FALLBACK_MODEL_SETTINGS = DEFAULT_MODEL_SETTINGS["openai"]
+# OpenRouter model ids are "vendor/model"; bare names are qualified by their family prefix
+_OPENROUTER_VENDOR_PREFIXES = (("gpt", "openai"), ("claude", "anthropic"), ("gemini", "google"), ("llama", "meta-llama"))
+_RETRY_STATUS_CODES = frozenset((429, 502, 503, 504))
+_HOME = os.environ.get("HOME") or os.path.expanduser("~")
+_CONFIG_PATH = os.path.join(_HOME, ".vibenix", "config.json")
+_config_lock = threading.RLock()  # Guards building _cached_config and _cached_model
+_genai_prices = None  # genai_prices module once imported, False if it is not installed
+_saved_config_cache: dict[tuple, dict] = {}  # (path, mtime_ns, size) -> parsed config.json
 
 
 def _extract_bedrock_tool_uses(messages: list[dict]) -> list[dict[str, Any]]:
@@ -176,18 +194,18 @@ def _log_bedrock_retry_diagnostics(error: Exception, params: dict[str, Any], ret
 
     error_summary = str(error).replace("\n", " ")[:220]
     logger.warning(
-        f"Bedrock retry {retry_number}/{max_retries} after ValidationException: {error_summary}"
+        "Bedrock retry {}/{} after ValidationException: {}", retry_number, max_retries, error_summary
     )
 
     if failing_tool_from_error:
         field_name = failing_tool_from_error["field_name"]
         field_type = failing_tool_from_error["field_value_type"]
-        logger.warning(f"Bedrock validation target: toolUse.{field_name} (type={field_type})")
+        logger.warning("Bedrock validation target: toolUse.{} (type={})", field_name, field_type)
 
     if invalid_tool_names:
-        logger.warning(f"Bedrock detected {len(invalid_tool_names)} invalid toolUse.name value(s)")
+        logger.warning("Bedrock detected {} invalid toolUse.name value(s)", len(invalid_tool_names))
     elif tool_uses:
-        logger.warning(f"Bedrock request contains {len(tool_uses)} toolUse block(s); names look valid")
+        logger.warning("Bedrock request contains {} toolUse block(s); names look valid", len(tool_uses))
     else:
         logger.warning("Bedrock request contains no toolUse blocks")
 
@@ -210,9 +228,13 @@ class RetryingBedrockClient:
             rewrites = _normalize_bedrock_tool_names_in_messages(messages)
             if rewrites:
                 logger.warning(
-                    f"Applied Bedrock toolUse.name normalization to {len(rewrites)} entr{'y' if len(rewrites) == 1 else 'ies'} before request"
+                    "Applied Bedrock toolUse.name normalization to {} entr{} before request",
+                    len(rewrites), 'y' if len(rewrites) == 1 else 'ies'
                 )
 
+        # botocore is only loaded once a Bedrock client exists
+        from botocore.exceptions import ClientError
+
         for attempt in range(1, total_attempts + 1):
             try:
                 return self._client.converse(**params)
@@ -225,14 +247,14 @@ class RetryingBedrockClient:
                     _log_bedrock_retry_diagnostics(error, params, retry_number=attempt, max_retries=self._max_retries)
                 else:
                     logger.warning(
-                        f"Bedrock client error before retry {attempt}/{self._max_retries}: "
-                        f"code={error_code}, message={str(error)}"
+                        "Bedrock client error before retry {}/{}: code={}, message={}",
+                        attempt, self._max_retries, error_code, error
                     )
             except Exception as error:
                 if attempt >= total_attempts:
                     raise
 
-                logger.warning(f"Bedrock unexpected error before retry {attempt}/{self._max_retries}: {str(error)}")
+                logger.warning("Bedrock unexpected error before retry {}/{}: {}", attempt, self._max_retries, error)
 
 
 def load_saved_configuration() -> Optional[Tuple[str, str, Optional[str], Optional[str]]]:
@@ -241,40 +263,80 @@ def load_saved_configuration() -> Optional[Tuple[str, str, Optional[str], Option
     This maintains compatibility with the previous configuration format.
     """
     try:
-        config_path = os.path.expanduser("~/.vibenix/config.json")
+        st = os.stat(_CONFIG_PATH)
+    except FileNotFoundError:
+        return None
+
+    try:
+        cache_key = (_CONFIG_PATH, st.st_mtime_ns, st.st_size)
+        config_data = _saved_config_cache.get(cache_key)
+        if config_data is None:
+            with open(_CONFIG_PATH, 'rb') as f:
+                # Key on the file actually read, in case it was replaced since the stat above
+                st = os.fstat(f.fileno())
+                config_data = json.loads(f.read())
+            _saved_config_cache[(_CONFIG_PATH, st.st_mtime_ns, st.st_size)] = config_data
         
-        if os.path.exists(config_path):
-            with open(config_path) as f:
-                config_data = json.load(f)
-            
-            # Extract configuration
-            provider_name = config_data.get("provider")
-            model = config_data.get("model")
-            ollama_host = config_data.get("ollama_host")
-            openai_api_base = config_data.get("openai_api_base")
+        # Extract configuration
+        provider_name = config_data.get("provider")
+        model = config_data.get("model")
+        ollama_host = config_data.get("ollama_host")
+        openai_api_base = config_data.get("openai_api_base")
+        
+        if provider_name and model:
+            # Set OPENAI_BASE_URL if using OpenAI with custom endpoint
+            if provider_name == "openai" and openai_api_base:
+                os.environ["OPENAI_BASE_URL"] = openai_api_base
             
-            if provider_name and model:
-                # Set OPENAI_BASE_URL if using OpenAI with custom endpoint
-                if provider_name == "openai" and openai_api_base:
-                    os.environ["OPENAI_BASE_URL"] = openai_api_base
-                
-                return provider_name, model, ollama_host, openai_api_base
+            return provider_name, model, ollama_host, openai_api_base
             
     except Exception as e:
-        logger.warning(f"Could not load saved configuration: {e}")
+        logger.warning("Could not load saved configuration: {}", e)
     
     return None
 
 
-def get_model_config(use_cached: bool=True, remove_model_prefix: bool=True) -> dict:
+def _normalize_base_url(base_url: str) -> str:
+    """Ensure base URL ends with /v1/ for OpenAI compatibility."""
+    if base_url.endswith(("/v1/", "/v1")):
+        return base_url
+    return (base_url[:-1] if base_url.endswith("/") else base_url) + "/v1/"
+
+
+def _is_local_endpoint(base_url: str) -> bool:
+    """Check if base_url points at a local or Ollama server, which takes no API key."""
+    url = urlparse(base_url)
+    return url.hostname in ("localhost", "127.0.0.1", "::1") or url.port == 11434 or "ollama" in (url.hostname or "")
+
+
+def _classify_endpoint(provider_name: str, base_url: Optional[str]) -> str:
+    """Classify an OpenAI-style config as "bedrock", "openrouter" or plain "openai"."""
+    if provider_name == "bedrock" or (base_url and "bedrock" in base_url and "api.aws" in base_url):
+        return "bedrock"
+    if provider_name == "openrouter" or (base_url and "openrouter.ai" in base_url):
+        return "openrouter"
+    return "openai"
+
+
+def get_model_config(use_cached: bool=True, remove_model_prefix: bool=True) -> ModelConfig:
     """Get the model configuration from saved config, and model settings from env."""
     
-    global _cached_config
+    global _cached_config, _cached_model_name
     
     # Return cached config if available
     if _cached_config is not None and use_cached:
         return _cached_config
-    
+
+    # The preload thread may be loading it concurrently, only load once
+    with _config_lock:
+        if _cached_config is None or not use_cached:
+            _cached_config = _load_model_config()
+            _cached_model_name = None
+        return _cached_config
+
+
+def _load_model_config() -> ModelConfig:
+    """Build the model configuration from the saved config and env model settings."""
     # Try to load saved configuration
     saved_config = load_saved_configuration()
     
@@ -293,32 +355,29 @@ def get_model_config(use_cached: bool=True, remove_model_prefix: bool=True) -> d
         elif ollama_host:
             base_url = ollama_host
         else:
-            base_url = "http://llama.digidow.ins.jku.at:11434/v1/"
-        
-        # Ensure base URL ends with /v1/ for OpenAI compatibility
-        if not base_url.endswith("/v1/") and not base_url.endswith("/v1"):
-            base_url = base_url.rstrip("/") + "/v1/"
-        
-        _cached_config = {
-            "provider": provider_name,
-            "model_name": model_name,
-            "base_url": base_url
-        }
+            base_url = _DEFAULT_BASE_URL
+        base_url = _normalize_base_url(base_url)
     else:
         # Default configuration
         logger.info("No saved configuration found, using defaults")
         provider_name = "openai"
-        _cached_config = {
-            "provider": "openai",
-            "model_name": "qwen3-coder-30b-a3b",
-            "base_url": "http://llama.digidow.ins.jku.at:11434/v1/"
-        }
-    model_settings = load_model_settings_from_env(provider_name)
-    _cached_config["model_settings"] = model_settings
-    
-    return _cached_config
+        model_name = _DEFAULT_MODEL_NAME
+        base_url = _DEFAULT_BASE_URL
+
+    # Resolve settings for the client initialize_model_config will build, so it can use them as-is
+    if provider_name in ("anthropic", "gemini"):
+        settings_provider = provider_name
+    else:
+        settings_provider = _classify_endpoint(provider_name, base_url)
+
+    return ModelConfig(
+        provider=provider_name,
+        model_name=model_name,
+        base_url=base_url,
+        model_settings=load_model_settings_from_env(settings_provider)
+    )
 
-def get_cached_model_config() -> dict:
+def get_cached_model_config() -> ModelConfig:
     """Get the cached model configuration without reloading."""
     global _cached_config
 
@@ -327,7 +386,7 @@ def get_cached_model_config() -> dict:
 
     return _cached_config
 
-def get_model() -> Model:
+def get_model() -> 'Model':
     """Get the model instance, creating it if necessary.""" # TODO not creating if necessary
     global _cached_model
 
@@ -350,9 +409,13 @@ def use_prompted_output() -> bool:
 
 def get_model_name() -> str:
     """Get the current model name for logging."""
-    config = get_model_config()
-    # Always construct the full model name with provider prefix
-    return f"{config['provider']}/{config['model_name']}"
+    global _cached_model_name
+
+    if _cached_model_name is None:
+        config = get_model_config()
+        # Always construct the full model name with provider prefix
+        _cached_model_name = f"{config.provider}/{config.model_name}"
+    return _cached_model_name
 
 
 def load_model_settings_from_env(provider: str) -> Dict[str, Any]:
@@ -363,144 +426,152 @@ def load_model_settings_from_env(provider: str) -> Dict[str, Any]:
     
     Example GitHub CI usage:
     VIBENIX_MODEL_SETTINGS: '{"temperature": 0.1, "max_tokens": 16384}'
+
+    The variable is read once per process and the merged settings are memoized per provider,
+    so changing it at runtime has no effect until _model_settings_env.cache_clear() is called.
     """
-    env_settings_json = os.environ.get("VIBENIX_MODEL_SETTINGS")
-    
+    # Callers merge into and pop from the result, so hand out a copy of the memoized dict
+    return _load_model_settings(provider, _model_settings_env()).copy()
+
+
+@lru_cache(maxsize=1)
+def _model_settings_env() -> Optional[str]:
+    """Read VIBENIX_MODEL_SETTINGS once, on first use (cache_clear() after monkeypatching it)."""
+    return os.environ.get("VIBENIX_MODEL_SETTINGS")
+
+
+@lru_cache(maxsize=8)
+def _load_model_settings(provider: str, env_settings_json: Optional[str]) -> Dict[str, Any]:
+    """Parse and merge model settings, memoized per (provider, raw env value)."""
     if env_settings_json:
         try:
             env_settings = json.loads(env_settings_json)
-            logger.info(f"Loaded model settings from VIBENIX_MODEL_SETTINGS environment variable")
+            logger.info("Loaded model settings from VIBENIX_MODEL_SETTINGS environment variable")
             
             # Merge with defaults to ensure all required keys exist
-            defaults = DEFAULT_MODEL_SETTINGS.get(provider, DEFAULT_MODEL_SETTINGS["openai"]).copy()
-            merged_settings = {**defaults, **env_settings}
+            merged_settings = {**_provider_defaults(provider), **env_settings}
             
-            logger.info(f"Using environment model settings: {merged_settings}")
+            logger.info("Using environment model settings: {}", merged_settings)
             return merged_settings
             
         except json.JSONDecodeError as e:
-            logger.warning(f"Invalid JSON in VIBENIX_MODEL_SETTINGS environment variable: {e}")
+            logger.warning("Invalid JSON in VIBENIX_MODEL_SETTINGS environment variable: {}", e)
             logger.warning("Falling back to default settings")
         except Exception as e:
-            logger.warning(f"Error parsing VIBENIX_MODEL_SETTINGS: {e}")
+            logger.warning("Error parsing VIBENIX_MODEL_SETTINGS: {}", e)
             logger.warning("Falling back to default settings")
     
     # Return defaults
-    defaults = DEFAULT_MODEL_SETTINGS.get(provider, DEFAULT_MODEL_SETTINGS["openai"]).copy()
-    return defaults
+    return dict(_provider_defaults(provider))
 
 
-def create_gemini_settings(settings: Dict[str, Any]) -> GoogleModelSettings:
-    """Create GoogleModelSettings from config dict."""
-    # Use constants for defaults
-    defaults = DEFAULT_MODEL_SETTINGS["gemini"].copy()
-    
-    # Merge user settings with defaults
-    merged_settings = {**defaults, **settings}
-    
-    # Handle thinking config - convert thinking_budget to google_thinking_config format
-    try:
-        thinking_budget = merged_settings.pop("thinking_budget", defaults["thinking_budget"])
-        merged_settings["google_thinking_config"] = {"thinking_budget": thinking_budget}
-    except Exception as e:
-        pass # No thinking config provided
-    info_msg = f"Creating Gemini settings:"
-    for key in merged_settings:
-        info_msg += f" {key}={merged_settings[key]},"
-    
-    logger.info(info_msg.rstrip(","))
-    return GoogleModelSettings(**merged_settings)
+def _provider_defaults(provider: str) -> Mapping[str, Any]:
+    """Return the provider's read-only default settings, OpenAI's for unknown providers."""
+    return DEFAULT_MODEL_SETTINGS.get(provider, _FALLBACK_MODEL_SETTINGS)
 
 
-def create_openai_settings(settings: Dict[str, Any]) -> OpenAIChatModelSettings:
-    """Create OpenAIChatModelSettings from config dict."""
-    # Use constants for defaults
-    defaults = DEFAULT_MODEL_SETTINGS["openai"].copy()
-    
-    merged_settings = {**defaults, **settings}
-    logger.info(f"Creating OpenAI settings: max_tokens={merged_settings.get('max_tokens')}, temperature={merged_settings.get('temperature')}")
-    return OpenAIChatModelSettings(**merged_settings)
+# Settings TypedDict per provider, imported on use like the provider SDKs themselves
+_SETTINGS_CLASSES = {
+    "openai": ("pydantic_ai.models.openai", "OpenAIChatModelSettings"),
+    "anthropic": ("pydantic_ai.models.anthropic", "AnthropicModelSettings"),
+    "gemini": ("pydantic_ai.models.google", "GoogleModelSettings"),
+    "openrouter": ("pydantic_ai.models.openrouter", "OpenRouterModelSettings"),
+    "bedrock": ("pydantic_ai.models.bedrock", "BedrockModelSettings"),
+}
 
 
-def create_anthropic_settings(settings: Dict[str, Any]) -> AnthropicModelSettings:
-    """Create AnthropicModelSettings from config dict."""
-    # Use constants for defaults
-    defaults = DEFAULT_MODEL_SETTINGS["anthropic"].copy()
-    
-    merged_settings = {**defaults, **settings}
-    logger.info(f"Creating Anthropic settings: max_tokens={merged_settings.get('max_tokens')}, temperature={merged_settings.get('temperature')}, anthropic_thinking={merged_settings.get('anthropic_thinking')}")
-    return AnthropicModelSettings(**merged_settings)
-
-def create_openrouter_settings(settings: Dict[str, Any]) -> OpenRouterModelSettings:
-    """Create OpenRouterModelSettings from config dict."""
-    # Use constants for defaults
-    defaults = DEFAULT_MODEL_SETTINGS["openrouter"].copy()
-    
-    merged_settings = {**defaults, **settings}
-    logger.info(f"Creating OpenRouter settings: max_tokens={merged_settings.get('max_tokens')}, temperature={merged_settings.get('temperature')}")
-    return OpenRouterModelSettings(**merged_settings)
-
-def create_bedrock_settings(settings: Dict[str, Any]) -> BedrockModelSettings:
-    """Create BedrockModelSettings from config dict."""
-    # Use constants for defaults
-    defaults = DEFAULT_MODEL_SETTINGS["bedrock"].copy()
-    
-    merged_settings = {**defaults, **settings}
-    logger.info(f"Creating Bedrock settings: max_tokens={merged_settings.get('max_tokens')}, temperature={merged_settings.get('temperature')}")
-    return BedrockModelSettings(**merged_settings)
+def create_model_settings(provider: str, settings: Dict[str, Any]) -> 'ModelSettings':
+    """Create the provider's model settings from settings already merged over the defaults.
+
+    ModelConfig.model_settings is resolved once per process by _load_model_settings, so it is used as-is.
+    """
+    module_name, class_name = _SETTINGS_CLASSES[provider]
+
+    merged_settings = settings
+    if provider == "gemini" and "thinking_budget" in merged_settings:
+        # Convert thinking_budget to google_thinking_config format, without touching the config's dict
+        merged_settings = {key: value for key, value in settings.items() if key != "thinking_budget"}
+        merged_settings["google_thinking_config"] = {"thinking_budget": settings["thinking_budget"]}
+
+    logger.opt(lazy=True).info(
+        "Creating {} settings: {}",
+        lambda: provider,
+        lambda: ", ".join(f"{key}={value}" for key, value in merged_settings.items())
+    )
+    settings_class = getattr(importlib.import_module(module_name), class_name)
+    return settings_class(**merged_settings)
 
 def initialize_model_config(model_settings = None):
-    """Initialize model configuration and create model instance. Must be called once at startup."""
-    global _cached_model, _use_prompted_output
+    """Initialize model configuration and create model instance. Must be called once at startup.
+
+    Later calls without explicit model_settings reuse the existing model and its HTTP client,
+    unless the saved configuration changed since it was built.
+    """
+    with _config_lock:
+        _initialize_model_config(model_settings)
+
 
-    config = get_model_config()
-    provider_name = config.get("provider", "openai")
-    model_name = config.get("model_name")
-    base_url = config.get("base_url", "")
+def _initialize_model_config(model_settings):
+    global _cached_config, _cached_model, _cached_model_name, _model_built_from, _use_prompted_output
+
+    # Always reload, the user may have reconfigured interactively since the model was built
+    config = _load_model_config()
+    if _cached_model is not None and model_settings is None and config == _model_built_from:
+        return
+    _cached_config = _model_built_from = config
+    _cached_model_name = None
+    _use_prompted_output = False
+
+    env_get = os.environ.get
+
+    provider_name = config.provider
+    model_name = config.model_name
+    base_url = config.base_url
     
-    logger.info(f"Loaded configuration: {provider_name}/{config['model_name']} from {provider_name}")
+    logger.info("Loaded configuration: {}/{} from {}", provider_name, model_name, provider_name)
     
     # Create model based on provider
     if provider_name == "anthropic":
         # Get Anthropic API key - check environment first (as override), then secure storage
         from vibenix.secure_keys import get_api_key
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        api_key = env_get("ANTHROPIC_API_KEY")
         if not api_key:
             api_key = get_api_key("ANTHROPIC_API_KEY")
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY not found in environment or secure storage. Run interactively to configure.")
         
-        logger.info(f"Using Anthropic model: {model_name}")
+        logger.info("Using Anthropic model: {}", model_name)
+        from pydantic_ai.models.anthropic import AnthropicModel
+        from pydantic_ai.providers.anthropic import AnthropicProvider
         provider = AnthropicProvider(api_key=api_key, http_client=create_retrying_client())
         
         if not model_settings:
             # Always use env settings or defaults, never from config file
-            env_settings = load_model_settings_from_env("anthropic")
-            model_settings = create_anthropic_settings(env_settings)
+            model_settings = create_model_settings("anthropic", config.model_settings)
         _cached_model = AnthropicModel(model_name, provider=provider, settings=model_settings)
     
     elif provider_name == "gemini":
         # Get Google API key - check environment first (as override), then secure storage
         from vibenix.secure_keys import get_api_key
-        api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+        api_key = env_get("GEMINI_API_KEY") or env_get("GOOGLE_API_KEY")
         if not api_key:
             api_key = get_api_key("GEMINI_API_KEY")
             if not api_key:
                 raise ValueError("GEMINI_API_KEY not found in environment or secure storage. Run interactively to configure.")
 
-        logger.info(f"Using Gemini model: {model_name}")
+        logger.info("Using Gemini model: {}", model_name)
 
         # Create a google.genai.Client with our retrying transport
         from google.genai import Client
         from google.genai.types import HttpOptions
         from pydantic_ai.models import get_user_agent
+        from pydantic_ai.models.google import GoogleModel
+        from pydantic_ai.providers.google import GoogleProvider
 
-        # Create the retrying client and extract its transport
-        retrying_client = create_retrying_client()
-
+        # google-genai builds its own httpx client, so hand it just the retrying transport
         http_options = HttpOptions(
             headers={'User-Agent': get_user_agent()},
-            async_client_args={'transport': retrying_client._transport}
+            async_client_args={'transport': _get_retrying_transport()}
         )
 
         gemini_client = Client(
@@ -512,25 +583,21 @@ def initialize_model_config(model_settings = None):
         provider = GoogleProvider(client=gemini_client)
 
         if not model_settings:
-            env_settings = load_model_settings_from_env("gemini")
-            model_settings = create_gemini_settings(env_settings)
-        _cached_model = GoogleModel(config["model_name"], provider=provider, settings=model_settings)
+            model_settings = create_model_settings("gemini", config.model_settings)
+        _cached_model = GoogleModel(config.model_name, provider=provider, settings=model_settings)
     else:
         # Default to OpenAI-compatible models
-        base_url = config.get("base_url")
-
         # Check if using OpenRouter or AWS Bedrock
-        is_openrouter = provider_name == "openrouter" or (base_url and 'openrouter.ai' in base_url)
-        is_bedrock = provider_name == "bedrock" or (base_url and 'bedrock' in base_url and 'api.aws' in base_url)
+        endpoint = _classify_endpoint(provider_name, base_url)
 
         # Auto-enable PromptedOutput mode for endpoints that don't reliably support tool-based structured outputs
-        if is_openrouter or is_bedrock:
+        if endpoint != "openai":
             _use_prompted_output = True
             logger.info("Auto-enabled PromptedOutput mode for better compatibility with this endpoint")
 
-        if is_bedrock:
+        if endpoint == "bedrock":
             from vibenix.secure_keys import get_api_key
-            api_key = os.environ.get("AWS_BEARER_TOKEN_BEDROCK")
+            api_key = env_get("AWS_BEARER_TOKEN_BEDROCK")
             if not api_key:
                 api_key = get_api_key("AWS_BEARER_TOKEN_BEDROCK")
                 if not api_key:
@@ -540,7 +607,11 @@ def initialize_model_config(model_settings = None):
             #model_name = config.get("model_name")
             #model_name = provider_name + "/" + model_name if '/' not in model_name else model_name
 
-            logger.info(f"Using AWS Bedrock model: {model_name} at {base_url}")
+            logger.info("Using AWS Bedrock model: {} at {}", model_name, base_url)
+            import boto3
+            from botocore.config import Config
+            from pydantic_ai.models.bedrock import BedrockConverseModel
+            from pydantic_ai.providers.bedrock import BedrockProvider
             #provider = OpenAIProvider(base_url=base_url, api_key=api_key, http_client=create_retrying_client())
             bedrock_boto_config = Config(
                 retries={
@@ -560,76 +631,97 @@ def initialize_model_config(model_settings = None):
             #_cached_config["model_name"] = model_name
 
             if not model_settings:
-                env_settings = load_model_settings_from_env("bedrock")
-                model_settings = create_bedrock_settings(env_settings)
+                model_settings = create_model_settings("bedrock", config.model_settings)
             _cached_model = BedrockConverseModel(model_name, provider=bedrock_provider, settings=model_settings)
             #if not model_settings:
             #    env_settings = load_model_settings_from_env("bedrock")
-            #    model_settings = create_openai_settings(env_settings)
+            #    model_settings = create_model_settings("openai", env_settings)
             #_cached_model = OpenAIChatModel(config["model_name"], provider=provider, settings=model_settings)
 
-        elif is_openrouter:
+        elif endpoint == "openrouter":
             # Use OpenRouterProvider for OpenRouter endpoints
             from vibenix.secure_keys import get_api_key
-            api_key = os.environ.get("OPENROUTER_API_KEY")
+            api_key = env_get("OPENROUTER_API_KEY")
             if not api_key:
                 api_key = get_api_key("OPENROUTER_API_KEY")
                 if not api_key:
                     raise ValueError("OPENROUTER_API_KEY not found in environment or secure storage. Run interactively to configure.")
 
-            config = get_model_config(use_cached=False, remove_model_prefix=False)
-            model_name = config.get("model_name")
-            model_name = provider_name + "/" + model_name if '/' not in model_name else model_name
+            if '/' not in model_name:
+                vendor = next((vendor for prefix, vendor in _OPENROUTER_VENDOR_PREFIXES if model_name.startswith(prefix)), provider_name)
+                model_name = vendor + "/" + model_name
 
-            logger.info(f"Using OpenRouter model: {model_name}")
+            logger.info("Using OpenRouter model: {}", model_name)
+            from pydantic_ai.models.openrouter import OpenRouterModel
+            from pydantic_ai.providers.openrouter import OpenRouterProvider
             provider = OpenRouterProvider(api_key=api_key, http_client=create_retrying_client())
 
             # Update the config cache with the corrected model name
-            _cached_config["model_name"] = model_name
+            _cached_config = replace(_cached_config, model_name=model_name)
+            _cached_model_name = None
 
             if not model_settings:
-                env_settings = load_model_settings_from_env("openrouter")
-                model_settings = create_openrouter_settings(env_settings)
+                model_settings = create_model_settings("openrouter", config.model_settings)
             _cached_model = OpenRouterModel(model_name, provider=provider, settings=model_settings)
         else:
             # Use OpenAIProvider for other OpenAI-compatible endpoints
             from vibenix.secure_keys import get_api_key
-            api_key = os.environ.get("OPENAI_API_KEY")
+            api_key = env_get("OPENAI_API_KEY")
             if not api_key:
-                api_key = get_api_key("OPENAI_API_KEY")
+                # For local/Ollama endpoints, API key is optional, so don't wait on the keyring
+                if not _is_local_endpoint(base_url):
+                    api_key = get_api_key("OPENAI_API_KEY")
                 if not api_key:
-                    # For local/Ollama endpoints, API key is optional
                     logger.info("No OPENAI_API_KEY found in environment or secure storage, using 'dummy'")
                     api_key = "dummy"
 
             # Log configuration details
-            if "OPENAI_BASE_URL" in os.environ:
-                logger.info(f"Set OPENAI_BASE_URL to {os.environ['OPENAI_BASE_URL']}")
+            openai_base_url = env_get("OPENAI_BASE_URL")
+            if openai_base_url:
+                logger.info("Set OPENAI_BASE_URL to {}", openai_base_url)
 
-            logger.info(f"Using OpenAI-compatible model: {model_name} at {base_url}")
+            logger.info("Using OpenAI-compatible model: {} at {}", model_name, base_url)
+            from pydantic_ai.models.openai import OpenAIChatModel
+            from pydantic_ai.providers.openai import OpenAIProvider
             provider = OpenAIProvider(base_url=base_url, api_key=api_key, http_client=create_retrying_client())
 
             if not model_settings:
-                env_settings = load_model_settings_from_env("openai")
-                model_settings = create_openai_settings(env_settings)
-            _cached_model = OpenAIChatModel(config["model_name"], provider=provider, settings=model_settings)
+                model_settings = create_model_settings("openai", config.model_settings)
+            _cached_model = OpenAIChatModel(config.model_name, provider=provider, settings=model_settings)
+
+
+def _get_genai_prices():
+    """Import genai_prices on first use; False if it is not installed."""
+    global _genai_prices
+
+    if _genai_prices is None:
+        try:
+            import genai_prices
+            _genai_prices = genai_prices
+        except ImportError:
+            _genai_prices = False
+    return _genai_prices
 
 
+@lru_cache(maxsize=4096)
 def calc_model_pricing(model: str, prompt_tokens: int, completion_tokens: int,
                        cache_read_tokens: int = 0) -> float:
+    genai_prices = _get_genai_prices()
+    if not genai_prices:
+        return 0.0
+    # "provider/model_ref"; the model ref itself may contain further slashes
+    provider, sep, model_ref = model.partition("/")
+    if not sep:
+        return 0.0
     try:
-        provider, model_ref = model.split("/", 1)
-        from genai_prices import calc_price, Usage
         # Get pricing from genai-prices library
-        price_data = calc_price(
-            Usage(input_tokens=prompt_tokens, output_tokens=completion_tokens,
-                  cache_read_tokens=cache_read_tokens),
+        price_data = genai_prices.calc_price(
+            genai_prices.Usage(input_tokens=prompt_tokens, output_tokens=completion_tokens,
+                               cache_read_tokens=cache_read_tokens),
             model_ref=model_ref,
             provider_id=provider,
             )
         return float(price_data.total_price)
-    except ImportError:
-        pass
     except Exception:
         # If genai-prices doesn't have this model, fall back to 0
         pass
@@ -638,7 +730,15 @@ def calc_model_pricing(model: str, prompt_tokens: int, completion_tokens: int,
 
 
 def create_retrying_client():
-    """Create a client with smart retry handling for rate limits and transient failures.
+    """Create a client with smart retry handling, see _get_retrying_transport."""
+    from httpx import AsyncClient
+
+    return AsyncClient(transport=_get_retrying_transport())
+
+
+@lru_cache(maxsize=1)
+def _get_retrying_transport():
+    """Get the shared transport with smart retry handling for rate limits and transient failures.
 
     This follows pydantic-ai best practices:
     - Respects Retry-After headers from 429 responses (when provided by API)
@@ -648,16 +748,22 @@ def create_retrying_client():
     """
 
     from pydantic_ai.retries import AsyncTenacityTransport, RetryConfig, wait_retry_after
-    from httpx import AsyncClient, HTTPStatusError, Response
+    from httpx import HTTPStatusError, Response
     from tenacity import retry_if_exception_type, stop_after_attempt, wait_exponential
 
+    # Shared by the transport and the retry logging, so the logged wait is the real one
+    wait_strategy = wait_retry_after(
+        fallback_strategy=wait_exponential(multiplier=3, min=3, max=60),
+        max_wait=300
+    )
+
     def should_retry_status(response: Response):
         """Raise HTTPStatusError for retryable status codes (429, 5xx).
 
         The wait_retry_after strategy will automatically extract and respect
         Retry-After headers from 429 responses before they become exceptions.
         """
-        if response.status_code in (429, 502, 503, 504):
+        if response.status_code in _RETRY_STATUS_CODES:
             response.raise_for_status()
 
     def log_retry_attempt(retry_state):
@@ -666,11 +772,7 @@ def create_retrying_client():
         attempt_number = retry_state.attempt_number
 
         # Calculate wait time using the same strategy
-        wait_func = wait_retry_after(
-            fallback_strategy=wait_exponential(multiplier=3, min=3, max=60),
-            max_wait=300
-        )
-        wait_seconds = wait_func(retry_state)
+        wait_seconds = wait_strategy(retry_state)
 
         # Check if we got a Retry-After header
         retry_after_header = None
@@ -679,28 +781,23 @@ def create_retrying_client():
 
         if retry_after_header:
             logger.warning(
-                f"Rate limited by API (attempt {attempt_number}/10). "
-                f"Retry-After header: {retry_after_header}. Waiting {wait_seconds:.1f} seconds..."
+                "Rate limited by API (attempt {}/10). Retry-After header: {}. Waiting {:.1f} seconds...",
+                attempt_number, retry_after_header, wait_seconds
             )
         else:
-            logger.warning(
-                f"Request failed (attempt {attempt_number}/10). "
-                f"Using exponential backoff: waiting {wait_seconds:.1f} seconds... "
-                f"Error: {type(exception).__name__}"
-                f": {str(exception)[:200].replace(chr(10), ' ')}"
+            logger.opt(lazy=True).warning(
+                "Request failed (attempt {}/10). Using exponential backoff: waiting {:.1f} seconds... Error: {}: {}",
+                lambda: attempt_number, lambda: wait_seconds, lambda: type(exception).__name__,
+                lambda: str(exception)[:200].replace(chr(10), ' ')
             )
 
-    transport = AsyncTenacityTransport(
+    return AsyncTenacityTransport(
         config=RetryConfig(
             retry=retry_if_exception_type((HTTPStatusError, ConnectionError)),
-            wait=wait_retry_after(
-                fallback_strategy=wait_exponential(multiplier=3, min=3, max=60),
-                max_wait=300
-            ),
+            wait=wait_strategy,
             stop=stop_after_attempt(10),
             reraise=True,
             before_sleep=log_retry_attempt,
         ),
         validate_response=should_retry_status
     )
-    return AsyncClient(transport=transport)
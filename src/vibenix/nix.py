@@ -1,118 +1,137 @@
+import json
+import re
+import shutil
 import subprocess
+from functools import lru_cache
+from itertools import count, islice
 
 from vibenix import config
 from vibenix.packaging_flow.model_prompts import evaluate_progress
 from vibenix.packaging_flow.Solution import Solution
 from vibenix.errors import NixBuildResult, NixError, NixErrorKind, NixBuildErrorDiff, FullLogDiff, ProcessedLogDiff, LogDiff
 
-import git
-
 from typing import Optional
 
-from vibenix.flake import update_flake
+from vibenix.flake import update_flake, get_repo, revert_to_commit
 from vibenix.ui.logging_config import logger
 
+# Plain literal: a substring test beats a regex search on megabyte-long build logs
+_HASH_MISMATCH = "hash mismatch in fixed-output derivation"
+# Compiled once, build logs can be megabytes long
+_HASH_PROGRESS_RE = re.compile(r"hash mismatch|expected sha256", re.IGNORECASE)
+_HASH_NOT_INCLUDED_RE = re.compile(r"hash '.*' does not include")
+_FULL_LOGS_RE = re.compile(r"For full logs, run 'nix log (.+?)'")
+_STORE_HASH_RE = re.compile(r"(?<=/nix/store/)[0-9a-z]{32}(?=-)")
+
+
+@lru_cache(maxsize=1)
+def _nix_executable() -> str:
+    """Absolute path of nix. With it and close_fds=False, subprocess can use posix_spawn instead of fork+exec."""
+    return shutil.which("nix") or "nix"
+
+
+_derivation_cache: dict[tuple[str, str], str] = {}  # (staged tree sha, target attr) -> derivation path
+
 
 def invoke_build(is_src_attr_only: bool) -> NixBuildResult:
     if is_src_attr_only:
         target_attr = f"{config.flake_dir}#default.src"
     else:
         target_attr = f"{config.flake_dir}#default"
-    # First, evaluate the flake to get the derivation path
-    # If this fails, it's an evaluation error
-    eval_result = subprocess.run(
-        ["nix", "path-info", "--derivation", target_attr],
-        text=True,
-        capture_output=True
-    )
-    
-    if eval_result.returncode != 0:
-        import re
-        if "invalid SRI hash" in eval_result.stderr or re.search(r"hash '.*' does not include", eval_result.stderr):
-            return NixBuildResult(
-                success=False,
-                is_src_attr_only=is_src_attr_only,
-                error=NixError(type=NixErrorKind.INVALID_HASH, error_message=eval_result.stderr)
-            )
-        if "hash mismatch in fixed-output derivation" in eval_result.stderr:
-            return NixBuildResult(
-                success=False,
-                is_src_attr_only=is_src_attr_only,
-                error=NixError(type=NixErrorKind.HASH_MISMATCH, error_message=eval_result.stderr)
-            )
+
+    def _fail(kind: NixErrorKind, error_message: str) -> NixBuildResult:
         return NixBuildResult(
             success=False,
             is_src_attr_only=is_src_attr_only,
-            error=NixError(type=NixErrorKind.EVAL_ERROR, error_message=eval_result.stderr)
+            error=NixError(type=kind, error_message=error_message)
         )
-    
-    derivation_path = eval_result.stdout.strip()
-    logger.info(f"Building derivation outputs: {derivation_path}^*")
+
+    # Nix reads tracked files from the working tree, so the staged tree identifies what it evaluates
+    # only when nothing is modified on top of it; identical trees (e.g. after a revert) evaluate identically
+    repo = get_repo()
+    cache_key = None if repo.is_dirty(index=False, working_tree=True) else (repo.index.write_tree().hexsha, target_attr)
+    derivation_path = _derivation_cache.get(cache_key) if cache_key else None
+    if derivation_path is None:
+        # First, evaluate the flake to get the derivation path
+        # If this fails, it's an evaluation error
+        eval_result = subprocess.run(
+            [_nix_executable(), "path-info", "--derivation", target_attr],
+            close_fds=False,
+            text=True,
+            capture_output=True
+        )
+        
+        if eval_result.returncode != 0:
+            if "invalid SRI hash" in eval_result.stderr or ("does not include" in eval_result.stderr and _HASH_NOT_INCLUDED_RE.search(eval_result.stderr)):
+                return _fail(NixErrorKind.INVALID_HASH, eval_result.stderr)
+            if _HASH_MISMATCH in eval_result.stderr:
+                return _fail(NixErrorKind.HASH_MISMATCH, eval_result.stderr)
+            return _fail(NixErrorKind.EVAL_ERROR, eval_result.stderr)
+        
+        derivation_path = eval_result.stdout.strip()
+        if cache_key:
+            _derivation_cache[cache_key] = derivation_path
+    logger.info("Building derivation outputs: {}^*", derivation_path)
 
     # Build the derivation outputs (not just the derivation file)
+    # --json reports the output paths, so a successful build needs no extra eval for them
     build_result = subprocess.run(
-        ["nix", "build", "--timeout", config.build_timeout, f"{derivation_path}^*", "--no-link"],
+        [_nix_executable(), "build", "--timeout", config.build_timeout, f"{derivation_path}^*", "--no-link", "--json"],
+        close_fds=False,
         text=True,
         capture_output=True
     )
 
     # If build succeeded, return success
     if build_result.returncode == 0:
-        return NixBuildResult(success=True, is_src_attr_only=is_src_attr_only)
+        outputs = json.loads(build_result.stdout)[0]["outputs"]
+        return NixBuildResult(success=True, is_src_attr_only=is_src_attr_only, out_path=outputs.get("out"))
 
     # Build failed, check if it's a hash mismatch before getting logs
-    if "hash mismatch in fixed-output derivation" in build_result.stderr:
-        return NixBuildResult(
-            success=False,
-            is_src_attr_only=is_src_attr_only,
-            error=NixError(type=NixErrorKind.HASH_MISMATCH, error_message=build_result.stderr)
-        )
+    if _HASH_MISMATCH in build_result.stderr:
+        return _fail(NixErrorKind.HASH_MISMATCH, build_result.stderr)
 
     # Not a hash mismatch, get logs for build error
+    # nix names the derivation that actually failed, which may be a dependency, so fetch its log directly
+    match = _FULL_LOGS_RE.search(build_result.stderr)
+    failed_derivation = match.group(1) if match else f"{derivation_path}^*"
     log_result = subprocess.run(
-        ["nix", "log", f"{derivation_path}^*"],
+        [_nix_executable(), "log", failed_derivation],
+        close_fds=False,
         text=True,
-        capture_output=True
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
     )
     
     if log_result.returncode != 0:
         # We should always be able to get logs after a build
         # Except if the build of a dependency failed
         # Return the build output which shows the dependency context more clearly
-        return NixBuildResult(
-            success=False,
-            is_src_attr_only=is_src_attr_only,
-            error=NixError(type=NixErrorKind.DEPENDENCY_BUILD_ERROR, error_message=build_result.stderr)
-        )
+        return _fail(NixErrorKind.DEPENDENCY_BUILD_ERROR, build_result.stderr)
 
-    return NixBuildResult(
-        success=False,
-        is_src_attr_only=is_src_attr_only,
-        error=NixError(type=NixErrorKind.BUILD_ERROR, error_message=log_result.stdout)
-    )
+    if match and failed_derivation != derivation_path:
+        return _fail(NixErrorKind.DEPENDENCY_BUILD_ERROR, log_result.stdout)
+    return _fail(NixErrorKind.BUILD_ERROR, log_result.stdout)
 
 
-def prepare_logs_for_comparison(initial_error: str, attempted_improvement: str, max_lines: int = 260) -> LogDiff:
-    """Prepare logs for comparison by finding divergence point using sophisticated matching that handles reordered lines."""
-    initial_lines_list = initial_error.splitlines()
-    improvement_lines_list = attempted_improvement.splitlines()
-    
+def _number_lines(lines: list[str], start_line: int = 0) -> str:
+    """Join lines[start_line:] prefixed with their 1-based line numbers, formatting through one bound template."""
+    return '\n'.join(map("{:4d}: {}".format, count(start_line + 1), islice(lines, start_line, None)))
+
+
+def prepare_logs_for_comparison(initial_lines_list: list[str], improvement_lines_list: list[str], max_lines: int = 260) -> LogDiff:
+    """Prepare logs for comparison by finding divergence point using sophisticated matching that handles reordered lines.
+
+    Takes the logs already split into lines, so callers split each log only once.
+    """
     initial_lines = len(initial_lines_list)
     improvement_lines = len(improvement_lines_list)
     
     # If both logs are under 100 lines, show them in full
     if initial_lines < 100 and improvement_lines < 100:
         # Add line numbers to the full logs
-        initial_numbered_lines = []
-        for i, line in enumerate(initial_lines_list, start=1):
-            initial_numbered_lines.append(f"{i:4d}: {line}")
-        
-        improvement_numbered_lines = []
-        for i, line in enumerate(improvement_lines_list, start=1):
-            improvement_numbered_lines.append(f"{i:4d}: {line}")
-        
-        initial_error_full = '\n'.join(initial_numbered_lines)
-        attempted_improvement_full = '\n'.join(improvement_numbered_lines)
+        initial_error_full = _number_lines(initial_lines_list)
+        attempted_improvement_full = _number_lines(improvement_lines_list)
         
         return FullLogDiff(
             previous_log=initial_error_full,
@@ -122,21 +141,29 @@ def prepare_logs_for_comparison(initial_error: str, attempted_improvement: str,
         )
     
     # Otherwise, use the existing truncation logic
-    # Create one set for O(1) lookup
-    improvement_set = set(improvement_lines_list)
-    
-    # Find the first line from initial log that doesn't exist anywhere in improvement log
-    divergence_line = 1
-    for i in range(min(len(initial_lines_list), len(improvement_lines_list))):
-        initial_line = initial_lines_list[i]
-        
-        # If this line doesn't exist in the other log, this is where they diverge
-        if initial_line not in improvement_set:
-            divergence_line = i + 1
+    # Lines equal at the same index trivially exist in the other log, so skip the common prefix first
+    common_prefix = 0
+    for initial_line, improvement_line in zip(initial_lines_list, improvement_lines_list):
+        if initial_line != improvement_line:
             break
+        common_prefix += 1
+    
+    if common_prefix == min(initial_lines, improvement_lines):
+        # One log is a prefix of the other (or empty), diverge at the length difference without building the set
+        divergence_line = common_prefix + 1
     else:
-        # If we didn't find such a pair, diverge at the length difference
-        divergence_line = min(initial_lines, improvement_lines) + 1
+        # Create one set for O(1) lookup
+        improvement_set = set(improvement_lines_list)
+        
+        # Find the first line from initial log that doesn't exist anywhere in improvement log
+        for i, initial_line in enumerate(islice(initial_lines_list, common_prefix, improvement_lines), start=common_prefix + 1):
+            # If this line doesn't exist in the other log, this is where they diverge
+            if initial_line not in improvement_set:
+                divergence_line = i
+                break
+        else:
+            # If we didn't find such a pair, diverge at the length difference
+            divergence_line = min(initial_lines, improvement_lines) + 1
     
     # Calculate how many lines to take from the end, considering divergence point
     # We want at most max_lines, but if divergence is late, we take from divergence point
@@ -144,16 +171,8 @@ def prepare_logs_for_comparison(initial_error: str, attempted_improvement: str,
     improvement_start_line = max(0, improvement_lines - max_lines, divergence_line - 1)
     
     # Add line numbers to the truncated logs
-    initial_truncated_lines = []
-    for i, line in enumerate(initial_lines_list[initial_start_line:], start=initial_start_line + 1):
-        initial_truncated_lines.append(f"{i:4d}: {line}")
-    
-    improvement_truncated_lines = []
-    for i, line in enumerate(improvement_lines_list[improvement_start_line:], start=improvement_start_line + 1):
-        improvement_truncated_lines.append(f"{i:4d}: {line}")
-    
-    initial_error_truncated = '\n'.join(initial_truncated_lines)
-    attempted_improvement_truncated = '\n'.join(improvement_truncated_lines)
+    initial_error_truncated = _number_lines(initial_lines_list, initial_start_line)
+    attempted_improvement_truncated = _number_lines(improvement_lines_list, improvement_start_line)
     
     return ProcessedLogDiff(
         previous_log_truncated=initial_error_truncated,
@@ -164,6 +183,14 @@ def prepare_logs_for_comparison(initial_error: str, attempted_improvement: str,
     )
 
 
+def get_tail_of_log(lines: list[str], max_lines: int = 50, max_line_length: int = 512) -> str:
+    """Return the last max_lines of an already split log, limiting line width like NixError.truncated."""
+    return '\n'.join(
+        line[:max_line_length] + "... [LINE TRUNCATED]" if len(line) > max_line_length else line
+        for line in lines[-max_lines:]
+    )
+
+
 # read build log of previous step and this step
 # to evalute if the model made progress towards building the project
 # this is done by counting magical phrases in the build output like
@@ -174,7 +201,7 @@ def eval_initial_build() -> NixError:
     error_message = build_result.error.error_message
     
     # Check if this is a hash mismatch error (indicates template was filled correctly)
-    if "hash mismatch" in error_message.lower() or "expected sha256" in error_message.lower():
+    if _HASH_PROGRESS_RE.search(error_message):
         logger.info("✅ Initial build shows hash mismatch - template was filled correctly!")
         # Return NixError object for LLM to fix the hash
         return NixError(type=NixErrorKind.HASH_MISMATCH, error_message=error_message)
@@ -182,40 +209,61 @@ def eval_initial_build() -> NixError:
         logger.info("❌ Initial build failed with non-hash error")
         return NixError(type=NixErrorKind.EVAL_ERROR, error_message=error_message)
 
+def _last_commit_diff():
+    """Changes of the latest build step commit against its parent."""
+    commit = get_repo().head.commit
+    return commit.parents[0].diff(commit)
+
 # a significantly higher number of magical phrases indicates progress
 # an about equal amount goes to an llm to break the tie using same_build_error with the two tails of the two build logs
 def eval_progress(previous_result: NixBuildResult, current_result: NixBuildResult, build_iteration: int) -> NixBuildErrorDiff:    
     if build_iteration == 1 or current_result.success:
         return NixBuildErrorDiff.PROGRESS
-    
-    # Log truncated versions for debugging
-    logger.info(f"previous error (last 50 lines): \n```\n{previous_result.error.truncated(50)}\n```\n")
-    logger.info(f"new error (last 50 lines): \n```\n{current_result.error.truncated(50)}\n```\n")
-
-    repo = git.Repo(config.flake_dir.as_posix())
-    logger.info(repo.commit().diff())
 
+    # Source-only transitions are decided without looking at the logs
     if not current_result.is_src_attr_only and previous_result.is_src_attr_only:
         return NixBuildErrorDiff.PROGRESS
     if current_result.is_src_attr_only:
         return NixBuildErrorDiff.REGRESS
 
+    # Logs that only differ in store path hashes show the same failure, no need to ask the model
+    previous_message = previous_result.error.error_message
+    current_message = current_result.error.error_message
+    if previous_message == current_message or (
+        len(previous_message) == len(current_message)
+        and _STORE_HASH_RE.sub("", previous_message) == _STORE_HASH_RE.sub("", current_message)
+    ):
+        logger.info("Build error is unchanged apart from store paths, treating as no progress")
+        return NixBuildErrorDiff.REGRESS
+
+    # The previous log was already split when it was the current one in the last iteration
+    previous_lines = previous_result.error.lines()
+    current_lines = current_result.error.lines()
+
+    # Log truncated versions for debugging
+    logger.opt(lazy=True).info("previous error (last 50 lines): \n```\n{}\n```\n", lambda: get_tail_of_log(previous_lines))
+    logger.opt(lazy=True).info("new error (last 50 lines): \n```\n{}\n```\n", lambda: get_tail_of_log(current_lines))
+
+    # Only diff when the message is actually emitted
+    logger.opt(lazy=True).info("{}", _last_commit_diff)
+
     # Prepare the logs for comparison with limited lines to avoid token limits
     log_comparison = prepare_logs_for_comparison(
-        previous_result.error.error_message,
-        current_result.error.error_message,
+        previous_lines,
+        current_lines,
         max_lines=240 # 260 exceeded token limit on gianni-rosato/aviator
     )
     
-    # Log the comparison details
-    logger.info(f"Log comparison details:")
-    logger.info(f"  Initial build: {log_comparison.initial_lines} total lines")
-    logger.info(f"  Attempted improvement: {log_comparison.improvement_lines} total lines")
+    # Log the comparison details as one record
     if isinstance(log_comparison, FullLogDiff):
-        logger.info(f"  Showing full logs (both under 100 lines)")
+        comparison_details = "  Showing full logs (both under 100 lines)"
     else:
-        logger.info(f"  Logs diverge at line: {log_comparison.divergence_line}")
-        logger.info(f"  Sending to model - truncated logs showing divergence")
+        comparison_details = (f"  Logs diverge at line: {log_comparison.divergence_line}\n"
+                              "  Sending to model - truncated logs showing divergence")
+    logger.info(
+        "Log comparison details:\n  Initial build: {} total lines\n  Attempted improvement: {} total lines\n{}",
+        log_comparison.initial_lines, log_comparison.improvement_lines, comparison_details
+    )
     
     return evaluate_progress(log_comparison)
 
@@ -226,18 +274,25 @@ def execute_build_and_add_to_stack(updated_code: str) -> Solution:
     if result.success:
         result = invoke_build(False)
     # Check if full log can be fetched with a nix command
-    import re
-    match = re.search(r"For full logs, run '(nix log .+?)'", result.error.error_message) if result.error else None
+    # (build failures already carry it, this covers builds triggered during evaluation)
+    match = _FULL_LOGS_RE.search(result.error.error_message) if result.error else None
     if match:
-        full_log_cmd = match.group(1)
         log_result = subprocess.run(
-            full_log_cmd.split(),
+            [_nix_executable(), "log", match.group(1)],
+            close_fds=False,
             text=True,
-            capture_output=True
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
         )
         if log_result.returncode == 0:
             result.error.error_message = log_result.stdout
-    out_path = get_build_output_path() if result.success else None
+    if result.error:
+        # Repeated identical errors share one string on the stack, which also makes comparing them an identity check
+        for previous in reversed(config.solution_stack):
+            if previous.result.error and previous.result.error.error_message == result.error.error_message:
+                result.error.error_message = previous.result.error.error_message
+                break
+    out_path = result.out_path if result.success else None
     solution = Solution(code=updated_code, commit_hash=commit_hash,
         result=result, out_path=out_path, error_index=len(config.solution_stack))
     config.solution_stack.append(solution)
@@ -245,18 +300,22 @@ def execute_build_and_add_to_stack(updated_code: str) -> Solution:
 
 def revert_packaging_to_solution(solution: Solution) -> None:
     """Revert the flake to a known good solution."""
-    repo = git.Repo(config.flake_dir.as_posix())
-    repo.git.reset('--hard', solution.commit_hash)
+    revert_to_commit(solution.commit_hash)
     config.solution_stack = config.solution_stack[:solution.error_index + 1]
-    logger.info(f"Reverted to commit {solution.commit_hash}.")
+    logger.info("Reverted to commit {}.", solution.commit_hash)
 
+@lru_cache(maxsize=128)
 def check_syntax(code: str) -> Optional[str]:
-    """Try to parse the Nix code to check for syntax errors."""
+    """Try to parse the Nix code to check for syntax errors.
+
+    Parsing depends only on the code, so results are memoized and re-checking unchanged code spawns no process.
+    """
     parse_result = subprocess.run(
         ["nix-instantiate", "--parse-only", "-"],
         input=code,
         text=True,
-        capture_output=True
+        stdout=subprocess.DEVNULL,  # the parsed expression is not needed, only errors
+        stderr=subprocess.PIPE
     )
     
     if parse_result.returncode != 0:
@@ -268,20 +327,22 @@ def run_formatter():
     """Run nixpkgs-fmt on the current package.nix to ensure consistent formatting."""
     from vibenix.flake import get_package_path
     file_path = get_package_path()
-    with open(file_path, 'r') as f:
-        format_result = subprocess.run(
-            ["nixfmt"],
-            text=True,
-            capture_output=True,
-            input=f.read()
-        )
+    with open(file_path, 'rb') as f:
+        original_code = f.read()
+    format_result = subprocess.run(
+        ["nixfmt"],
+        capture_output=True,
+        input=original_code
+    )
     if format_result.returncode != 0:
-        print("nixpkgs-fmt failed:", format_result.stderr.strip())
-        logger.warning(f"nixpkgs-fmt failed: {format_result.stderr.strip()}")
+        error = format_result.stderr.decode().strip()
+        print("nixpkgs-fmt failed:", error)
+        logger.warning("nixpkgs-fmt failed: {}", error)
         # if formatter fails, we don't block the flow
         return
-    else:
-        updated_code = format_result.stdout
+    elif format_result.stdout != original_code:
+        # Already formatted code needs no rewrite
+        updated_code = format_result.stdout.decode()
         update_flake(updated_code)
 
 
@@ -291,7 +352,8 @@ def get_build_output_path() -> Optional[str]:
         ["nix", "eval", "--raw", ".#default.outPath"],
         text=True,
         cwd=config.flake_dir,
-        capture_output=True
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
     )
     
     if eval_result.returncode != 0:
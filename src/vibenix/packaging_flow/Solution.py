@@ -1,9 +1,10 @@
 """Module defining the Solution data model."""
-from pydantic import BaseModel
+from dataclasses import dataclass
 from vibenix.errors import NixBuildResult
 from typing import Optional
 
-class Solution(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Solution:
     """Represents a solution candidate with its code and build result."""
     code: str
     commit_hash: str
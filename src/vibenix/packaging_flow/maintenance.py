@@ -1,8 +1,10 @@
 """Maintenance mode for vibenix - analyze and fix existing Nix package directories."""
 
 from pathlib import Path
+import os
 import subprocess
 import re
+from functools import lru_cache
 from typing import Optional
 from vibenix.ui.logging_config import logger
 
@@ -15,6 +17,15 @@ from vibenix.packaging_flow.model_prompts import analyze_package_failure, classi
 from vibenix.packaging_flow.refinement import refine_package
 from vibenix import config
 
+_COMMIT_HASH_RE = re.compile(r'[0-9a-f]{7,40}', re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _src_ref_key_re(keys: tuple[str, ...]) -> re.Pattern:
+    """Compile the attribute-assignment pattern for the given src reference keys once."""
+    key_pattern = "|".join(re.escape(k) for k in keys)
+    return re.compile(rf'^(\s*)({key_pattern})\s*=.*')
+
 
 def _rewrite_src_ref_attributes(file_path: Path, line_num: int, replacement: str,
                                 keys: tuple[str, ...], force_rev_key: bool = False) -> bool:
@@ -23,14 +34,14 @@ def _rewrite_src_ref_attributes(file_path: Path, line_num: int, replacement: str
         lines = f.readlines()
         depth, started = 0, False
         replaced = False
-        key_pattern = "|".join(re.escape(k) for k in keys)
+        key_re = _src_ref_key_re(keys)
 
         for i in range(line_num - 1, len(lines)):
             depth += lines[i].count('{') - lines[i].count('}')
             if '{' in lines[i]:
                 started = True
 
-            match = re.match(rf'^(\s*)({key_pattern})\s*=.*', lines[i])
+            match = key_re.match(lines[i])
             if match:
                 indent, key = match.groups()
                 target_key = "rev" if force_rev_key else key
@@ -68,7 +79,7 @@ def _run_nix_update(project_url: Optional[str], revision: Optional[str], version
         )
 
     try:
-        is_hash = bool(re.fullmatch(r'[0-9a-f]{7,40}', revision, re.IGNORECASE)) if revision else False
+        is_hash = bool(_COMMIT_HASH_RE.fullmatch(revision)) if revision else False
         if is_hash and not force_version_only:
             from vibenix.flake import get_attr_pos
             src_pos = get_attr_pos("src")
@@ -161,12 +172,11 @@ def update_fetcher(project_url: Optional[str], revision: Optional[str],
 
 
 def update_lock_file() -> None:
-    """Update the flake.lock file using `nix flake update`."""
-    coordinator_progress("Updating flake.lock file using `nix flake update`")
-    # TODO only update nixpkgs input
+    """Update the nixpkgs input in the flake.lock file using `nix flake update nixpkgs`."""
+    coordinator_progress("Updating flake.lock file using `nix flake update nixpkgs`")
     try:
         result = subprocess.run(
-            [ "nix", "flake", "update" ],
+            [ "nix", "flake", "update", "nixpkgs" ],
             cwd=config.flake_dir,
             capture_output=True,
             text=True,
@@ -195,9 +205,10 @@ def fetch_project_src() -> str:
     # Build a minimal derivation that fetches and unpacks the source
     # Similar to evaluate_fetcher_content but uses the src from the local flake directly
     nix_expr = f"""
-let pkgs = (builtins.getFlake (toString ./.)).inputs.nixpkgs.legacyPackages.${{builtins.currentSystem}};
-    localFlake = builtins.getFlake (toString ./.);
-    packageDrv = localFlake.packages.${{builtins.currentSystem}}.default;
+let localFlake = builtins.getFlake (toString ./.);
+    system = builtins.currentSystem;
+    pkgs = localFlake.inputs.nixpkgs.legacyPackages.${{system}};
+    packageDrv = localFlake.packages.${{system}}.default;
 in with pkgs; stdenv.mkDerivation {{
   # Inherit pname, version, and src from the local package
   pname = packageDrv.pname or "package";
@@ -281,7 +292,18 @@ def save_package_output(package_directory: Path, output_dir: str) -> None:
         return [n for n in names if n in exclude or n.startswith(".git") 
                 or (Path(path) / n).is_symlink()]
 
-    shutil.copytree(package_directory, output_path, dirs_exist_ok=True, ignore=ignore)
+    def link_or_copy(src, dst):
+        # Hardlink when source and destination share a filesystem, copy otherwise.
+        # Replace an existing dst instead of writing through it (it may already be a link to src)
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    shutil.copytree(package_directory, output_path, dirs_exist_ok=True, ignore=ignore,
+                    copy_function=link_or_copy)
     coordinator_message(f"Saved updated package.nix to: {output_path / 'package.nix'}")
 
 def create_nixpkgs_function_calls(initial_path: str):
@@ -3,6 +3,7 @@ from pathlib import Path
 import subprocess
 import shlex
 import os
+import codecs
 from magika import Magika
 from itertools import islice
 from vibenix.ccl_log import get_logger, log_function_call
@@ -10,6 +11,15 @@ from vibenix.ccl_log import get_logger, log_function_call
 MAX_LINES_TO_READ = 200
 MAX_LINE_LENGTH = 300
 
+_magika = None
+
+def _get_magika() -> Magika:
+    """Return the shared Magika instance, loading its model on first use."""
+    global _magika
+    if _magika is None:
+        _magika = Magika()
+    return _magika
+
 def create_source_function_calls(store_path: str, prefix: str = "", dynamic_path: bool = False) -> List[Callable]:
     """
     Create a list of source analysis related function calls.
@@ -50,8 +60,17 @@ def create_source_function_calls(store_path: str, prefix: str = "", dynamic_path
             # Directories are not text files, return False
             return False
         
-        magika = Magika()
-        result = magika.identify_path(path)
+        if path.suffix == ".nix" and not os.environ.get("VIBENIX_STRICT_FILETYPE"):
+            # Nix files are read constantly; a UTF-8 check on the head avoids loading Magika's model
+            with open(path, 'rb') as f:
+                head = f.read(4096)
+            try:
+                codecs.getincrementaldecoder('utf-8')().decode(head)
+            except UnicodeDecodeError:
+                return False
+            return True
+
+        result = _get_magika().identify_path(path)
         return result.output.is_text
 
     # Create the function names with prefix
@@ -85,15 +104,14 @@ def create_source_function_calls(store_path: str, prefix: str = "", dynamic_path
                 return f"File '{relative_path}' is not a text file. {detect_file_type_and_size(relative_path)}."
 
             number_lines_to_read = min(max(0, number_lines_to_read), MAX_LINES_TO_READ)
-            with open(path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                sliced_lines = islice(content.splitlines(keepends=True), line_offset, line_offset + number_lines_to_read)
-                # limit individual line length
-                sliced_lines = [line if len(line) <= MAX_LINE_LENGTH else line[:MAX_LINE_LENGTH] + " (... truncated)\n" for line in sliced_lines]
-                total_lines = len(content.splitlines())
-                if line_offset >= total_lines:
-                    return f"Line offset '{line_offset}' is beyond the end of the file which has {total_lines} lines."
-                return "".join(sliced_lines) + f"\n(showing lines {line_offset} to {min(line_offset + number_lines_to_read, total_lines)}, out of {total_lines} total lines)"
+            lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
+            total_lines = len(lines)
+            if line_offset >= total_lines:
+                return f"Line offset '{line_offset}' is beyond the end of the file which has {total_lines} lines."
+            sliced_lines = islice(lines, line_offset, line_offset + number_lines_to_read)
+            # limit individual line length
+            sliced_lines = [line if len(line) <= MAX_LINE_LENGTH else line[:MAX_LINE_LENGTH] + " (... truncated)\n" for line in sliced_lines]
+            return "".join(sliced_lines) + f"\n(showing lines {line_offset} to {min(line_offset + number_lines_to_read, total_lines)}, out of {total_lines} total lines)"
         except Exception as e:
             return f"Error reading file content: {str(e)}"
     
@@ -105,8 +123,7 @@ def create_source_function_calls(store_path: str, prefix: str = "", dynamic_path
             if not path.exists():
                 return f"File '{relative_path}' does not exist"
             
-            magika = Magika()
-            result = magika.identify_path(path)
+            result = _get_magika().identify_path(path)
             
             if path.is_file():
                 # Get file size
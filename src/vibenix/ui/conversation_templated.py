@@ -159,7 +159,7 @@ class ModelPromptManager:
 
                 from vibenix.model_config import get_cached_model_config
                 model_config = get_cached_model_config()
-                if len(functions) == 0 and model_config["provider"] in ["openai"]:
+                if len(functions) == 0 and model_config.provider in ["openai"]:
                     # If no functions are provided, add a noop tool to avoid errors
                     from vibenix.tools import noop_tool
                     functions = [noop_tool]
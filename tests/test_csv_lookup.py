@@ -0,0 +1,88 @@
+"""Tests for the cached CSV dataset lookup in main."""
+
+import os
+
+import pytest
+from diskcache import Cache
+
+import vibenix.main
+from vibenix.main import lookup_csv_package
+
+
+HEADER = "package_name,pname,version,fetcher,nixpkgs_target_bump\n"
+
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    """Use a throwaway disk cache instead of the shared cachedir."""
+    test_cache = Cache(str(tmp_path / "cache"))
+    monkeypatch.setattr(vibenix.main, "cache", test_cache)
+    yield test_cache
+    test_cache.close()
+
+
+class TestLookupCsvPackage:
+    """Tests for lookup_csv_package."""
+
+    def test_hit(self, tmp_path, isolated_cache):
+        """Test that a listed package returns its row, also from the cached index."""
+        csv_path = tmp_path / "dataset.csv"
+        csv_path.write_text(HEADER + "hello,hello,2.12,fetchurl {},abc123\n")
+
+        expected = ("hello", "2.12", "fetchurl {}", "abc123")
+        assert lookup_csv_package(str(csv_path), "hello") == expected
+        assert lookup_csv_package(str(csv_path), "hello") == expected
+
+    def test_hit_reads_only_the_cache(self, tmp_path, isolated_cache, monkeypatch):
+        """Test that a lookup against an indexed, unchanged file does not read the file."""
+        csv_path = tmp_path / "dataset.csv"
+        csv_path.write_text(HEADER + "hello,hello,2.12,fetchurl {},abc123\ncowsay,cowsay,3.8,fetchurl {},abc123\n")
+        lookup_csv_package(str(csv_path), "hello")
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("CSV file was scanned on a cache hit")
+        monkeypatch.setattr(vibenix.main, "open", fail_open, raising=False)
+
+        assert lookup_csv_package(str(csv_path), "cowsay") == ("cowsay", "3.8", "fetchurl {}", "abc123")
+
+    def test_evicted_row(self, tmp_path, isolated_cache):
+        """Test that a row evicted from the shared cache is recovered from the file."""
+        csv_path = tmp_path / "dataset.csv"
+        csv_path.write_text(HEADER + "hello,hello,2.12,fetchurl {},abc123\n")
+        lookup_csv_package(str(csv_path), "hello")
+
+        for key in list(isolated_cache):
+            if key[0] == "csv_row":
+                del isolated_cache[key]
+
+        assert lookup_csv_package(str(csv_path), "hello") == ("hello", "2.12", "fetchurl {}", "abc123")
+
+    def test_first_row_wins(self, tmp_path, isolated_cache):
+        """Test that duplicate package names resolve to the first row."""
+        csv_path = tmp_path / "dataset.csv"
+        csv_path.write_text(HEADER + "hello,hello,1,f1,c1\nhello,hello,2,f2,c2\n")
+
+        assert lookup_csv_package(str(csv_path), "hello") == ("hello", "1", "f1", "c1")
+
+    def test_miss(self, tmp_path, isolated_cache):
+        """Test that an unlisted package returns None."""
+        csv_path = tmp_path / "dataset.csv"
+        csv_path.write_text(HEADER + "hello,hello,2.12,fetchurl {},abc123\n")
+
+        assert lookup_csv_package(str(csv_path), "missing") is None
+        assert lookup_csv_package(str(csv_path), "missing") is None
+
+    def test_rebuild_after_change(self, tmp_path, isolated_cache):
+        """Test that editing the CSV replaces the cached index."""
+        csv_path = tmp_path / "dataset.csv"
+        csv_path.write_text(HEADER + "hello,hello,2.12,fetchurl {},abc123\n")
+        assert lookup_csv_package(str(csv_path), "hello") == ("hello", "2.12", "fetchurl {}", "abc123")
+
+        csv_path.write_text(HEADER + "hello,hello,2.13,fetchurl {},def456\ncowsay,cowsay,3.8,fetchurl {},def456\n")
+        st = os.stat(csv_path)
+        os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert lookup_csv_package(str(csv_path), "hello") == ("hello", "2.13", "fetchurl {}", "def456")
+        assert lookup_csv_package(str(csv_path), "cowsay") == ("cowsay", "3.8", "fetchurl {}", "def456")
+        # Rows of the previous version are dropped: two rows plus the stamp marker remain
+        assert len(isolated_cache) == 3
@@ -0,0 +1,74 @@
+"""Tests for model initialization in model_config."""
+
+import json
+import os
+
+import pytest
+
+import vibenix.defaults  # model_config must not be the first module of its import cycle
+import vibenix.model_config as model_config
+
+
+def write_config(path, model):
+    """Write a saved configuration for a local OpenAI-compatible endpoint."""
+    path.write_text(json.dumps({
+        "provider": "openai",
+        "model": model,
+        "openai_api_base": "http://localhost:11434/v1/",
+    }))
+    # Make sure a rewrite within the timestamp granularity still looks changed
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """Point model_config at a temporary config.json and start without a model."""
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(model_config, "_CONFIG_PATH", str(path))
+    monkeypatch.setattr(model_config, "_cached_config", None)
+    monkeypatch.setattr(model_config, "_cached_model", None)
+    monkeypatch.setattr(model_config, "_cached_model_name", None)
+    monkeypatch.setattr(model_config, "_model_built_from", None)
+    monkeypatch.setattr(model_config, "_use_prompted_output", False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.delenv("VIBENIX_MODEL_SETTINGS", raising=False)
+    return path
+
+
+class TestInitializeModelConfig:
+    """Tests for initialize_model_config."""
+
+    def test_reuses_model_for_unchanged_config(self, config_path):
+        """Test that a repeated call keeps the existing model and its client."""
+        write_config(config_path, "model-a")
+        model_config.initialize_model_config()
+        model = model_config.get_model()
+
+        model_config.initialize_model_config()
+
+        assert model_config.get_model() is model
+
+    def test_rebuilds_model_after_reconfiguration(self, config_path):
+        """Test that a changed saved configuration replaces the model and cached config."""
+        write_config(config_path, "model-a")
+        model_config.initialize_model_config()
+        model = model_config.get_model()
+
+        write_config(config_path, "model-b")
+        model_config.initialize_model_config()
+
+        assert model_config.get_model() is not model
+        assert model_config.get_model().model_name == "model-b"
+        assert model_config.get_model_config().model_name == "model-b"
+        assert model_config.get_model_name() == "openai/model-b"
+
+    def test_rebuild_resets_prompted_output(self, config_path, monkeypatch):
+        """Test that prompted output mode does not carry over to a plain OpenAI endpoint."""
+        monkeypatch.setattr(model_config, "_use_prompted_output", True)
+        write_config(config_path, "model-a")
+
+        model_config.initialize_model_config()
+
+        assert model_config.use_prompted_output() is False